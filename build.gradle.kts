@@ -56,6 +56,11 @@ tasks {
         )
     }
 
+    runIde {
+        // Verbose MCP message tracing in McpClient: ./gradlew runIde -PmcpDebug=true
+        jvmArgs("-Dmcp.inspector.debug=${project.findProperty("mcpDebug") ?: "false"}")
+    }
+
     patchPluginXml {
         sinceBuild.set("233")
         untilBuild.set("241.*")
@@ -46,53 +46,114 @@ Monitors Python files for changes and restarts the server automatically
 
 import os
 import sys
-import time
 import signal
 import subprocess
-from pathlib import Path
+import threading
+from contextlib import suppress
 from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler
+from watchdog.events import PatternMatchingEventHandler
 
-class ServerRestartHandler(FileSystemEventHandler):
+# Editors save in bursts (swap files, temp renames); coalesce them into one restart
+RESTART_DEBOUNCE_SECONDS = 0.3
+# Grace period for SIGTERM before the server's process group is killed
+STOP_TIMEOUT_SECONDS = 1
+
+class ServerRestartHandler(PatternMatchingEventHandler):
     def __init__(self, server_script):
+        # Only restart on Python file changes; is_ignored_path() skips caches and hidden trees
+        super().__init__(patterns=['*.py'], ignore_directories=True)
         self.server_script = server_script
         self.process = None
+        self._pending_restart = None
+        self._restart_lock = threading.Lock()
+        self._stopping = False
         self.restart_server()
         
     def on_modified(self, event):
-        if event.is_directory:
+        self.schedule_restart(event.src_path)
+    
+    def on_created(self, event):
+        self.schedule_restart(event.src_path)
+    
+    def on_moved(self, event):
+        self.schedule_restart(event.dest_path)
+    
+    def schedule_restart(self, path):
+        if self._stopping or is_ignored_path(path):
             return
-            
-        # Only restart on Python file changes
-        if event.src_path.endswith('.py'):
-            print(f"\n🔄 File changed: {event.src_path}")
-            print("🔄 Restarting server...")
-            self.restart_server()
+        
+        print(f"\n🔄 File changed: {path}")
+        if self._pending_restart:
+            self._pending_restart.cancel()
+        self._pending_restart = threading.Timer(RESTART_DEBOUNCE_SECONDS, self.on_debounced_change)
+        self._pending_restart.daemon = True
+        self._pending_restart.start()
+    
+    def cancel_pending_restart(self):
+        if self._pending_restart:
+            self._pending_restart.cancel()
+            self._pending_restart = None
+    
+    def on_debounced_change(self):
+        print("🔄 Restarting server...")
+        self.restart_server()
     
     def restart_server(self):
+        with self._restart_lock:
+            self._restart_server()
+    
+    def stop_server(self):
+        """Stop the server together with any children it spawned"""
+        if not self.process:
+            return
+        
+        # The server leads its own process group, so signal the whole group.
+        # uvicorn binds with SO_REUSEADDR, so port 8050 is free once the group exits.
+        signal_process_group(self.process.pid, signal.SIGTERM)
+        try:
+            self.process.wait(timeout=STOP_TIMEOUT_SECONDS)
+        except subprocess.TimeoutExpired:
+            signal_process_group(self.process.pid, signal.SIGKILL)
+            self.process.wait()
+        self.process = None
+    
+    def shutdown(self):
+        """Stop for good; waits out any restart already in progress"""
+        with self._restart_lock:
+            self._stopping = True
+            self.cancel_pending_restart()
+            self.stop_server()
+    
+    def _restart_server(self):
+        if self._stopping:
+            return
+        
         # Kill existing process
         if self.process:
             print("🛑 Stopping current server...")
-            self.process.terminate()
-            try:
-                self.process.wait(timeout=5)
-            except subprocess.TimeoutExpired:
-                self.process.kill()
-                self.process.wait()
+            self.stop_server()
         
         # Start new process
         print(f"🚀 Starting server: {self.server_script}")
-        self.process = subprocess.Popen([
+        process = subprocess.Popen([
             sys.executable, self.server_script
-        ], stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1)
+        ], stdout=subprocess.PIPE, stderr=subprocess.STDOUT, bufsize=0, start_new_session=True)
+        self.process = process
         
-        # Print server output in real-time
+        # Print server output in real-time, one large raw read at a time
         def print_output():
-            for line in iter(self.process.stdout.readline, ''):
-                if line:
-                    print(f"[SERVER] {line.rstrip()}")
+            fd = process.stdout.fileno()
+            partial = b""
+            while True:
+                chunk = os.read(fd, 65536)
+                if not chunk:
+                    break
+                *lines, partial = (partial + chunk).split(b"\n")
+                if lines:
+                    print_server_lines(lines)
+            if partial:
+                print_server_lines([partial])
         
-        import threading
         output_thread = threading.Thread(target=print_output, daemon=True)
         output_thread.start()
         
@@ -100,6 +161,24 @@ class ServerRestartHandler(FileSystemEventHandler):
         print("📁 Monitoring files for changes...")
         print("🛑 Press Ctrl+C to stop")
 
+def signal_process_group(pgid, sig):
+    # The group may already be gone if the server exited on its own
+    with suppress(ProcessLookupError):
+        os.killpg(pgid, sig)
+
+def print_server_lines(lines):
+    text = b"\n".join(lines).decode("utf-8", errors="replace")
+    sys.stdout.write("".join(f"[SERVER] {line.rstrip()}\n" for line in text.split("\n")))
+    sys.stdout.flush()
+
+def is_ignored_path(path):
+    """Skip bytecode caches and hidden trees such as .git or .venv"""
+    parts = os.path.normpath(path).split(os.sep)
+    return any(
+        part == '__pycache__' or (part.startswith('.') and part not in ('.', '..'))
+        for part in parts
+    )
+
 def main():
     server_script = "server.py"
     
@@ -107,23 +186,30 @@ def main():
         print(f"❌ Error: {server_script} not found in current directory")
         sys.exit(1)
     
+    # Sleep until Ctrl+C, SIGTERM or hangup instead of waking up every second.
+    # The server runs in its own session, so it never sees the terminal's SIGHUP itself.
+    # The handlers do nothing: the interpreter writes each signal to the wakeup pipe,
+    # so no lock is taken inside a handler and a signal can't slip in before the wait.
+    wakeup_read, wakeup_write = os.pipe()
+    os.set_blocking(wakeup_write, False)
+    signal.set_wakeup_fd(wakeup_write)
+    for sig in (signal.SIGINT, signal.SIGTERM, signal.SIGHUP):
+        signal.signal(sig, lambda *_: None)
+    
     # Setup file watcher
     event_handler = ServerRestartHandler(server_script)
     observer = Observer()
     observer.schedule(event_handler, ".", recursive=True)
     
-    try:
-        observer.start()
-        while True:
-            time.sleep(1)
-    except KeyboardInterrupt:
-        print("\n🛑 Shutting down...")
-        observer.stop()
-        if event_handler.process:
-            event_handler.process.terminate()
-            event_handler.process.wait()
+    observer.start()
+    os.read(wakeup_read, 1)
     
+    print("\n🛑 Shutting down...")
+    # Drain the observer first so no late event can arm a new restart timer
+    observer.stop()
     observer.join()
+    event_handler.shutdown()
+    
     print("👋 Server stopped.")
 
 if __name__ == "__main__":
@@ -141,4 +227,4 @@ echo "   - Press Ctrl+C to stop the server and file monitoring"
 echo ""
 
 cd simple-server-setup
-python watch_server.py
+exec python watch_server.py
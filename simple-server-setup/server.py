@@ -1,6 +1,6 @@
+import time
 from mcp.server.fastmcp import FastMCP
 from dotenv import load_dotenv
-from datetime import datetime
 
 load_dotenv("../.env")
 
@@ -20,12 +20,19 @@ def add(a: int, b: int) -> int:
     return a + b
 
 
+# get_server_time has second resolution, so only reformat when the second changes
+_time_cache = {"second": None, "val": ""}
+
+
 # Add a tool to get current server time
 @mcp.tool()
 def get_server_time() -> str:
     """Get the current date and time on the server"""
-    current_time = datetime.now()
-    return current_time.strftime("%Y-%m-%d %H:%M:%S")
+    now = int(time.time())
+    if now != _time_cache["second"]:
+        _time_cache["val"] = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(now))
+        _time_cache["second"] = now
+    return _time_cache["val"]
 
 
 # Add a tool for introduction
@@ -35,17 +42,19 @@ def introduction(name: str) -> str:
     return f"{name}, you are magnificent!"
 
 
+# Display names for the supported transports
+TRANSPORTS = {
+    "stdio": "stdio",
+    "sse": "SSE",
+    "streamable-http": "Streamable HTTP",
+}
+
+
 # Run the server
 if __name__ == "__main__":
     transport = "sse"  # Changed to SSE for plugin testing
-    if transport == "stdio":
-        print("Running server with stdio transport")
-        mcp.run(transport="stdio")
-    elif transport == "sse":
-        print("Running server with SSE transport")
-        mcp.run(transport="sse")
-    elif transport == "streamable-http":
-        print("Running server with Streamable HTTP transport")
-        mcp.run(transport="streamable-http")
-    else:
+    transport_name = TRANSPORTS.get(transport)
+    if transport_name is None:
         raise ValueError(f"Unknown transport: {transport}")
+    print(f"Running server with {transport_name} transport")
+    mcp.run(transport=transport)
@@ -14,7 +14,8 @@ import kotlinx.coroutines.flow.StateFlow
 import kotlinx.coroutines.flow.asStateFlow
 import kotlinx.serialization.encodeToString
 import kotlinx.serialization.json.*
-import java.util.*
+import java.util.concurrent.ConcurrentHashMap
+import java.util.concurrent.ThreadLocalRandom
 import java.util.concurrent.atomic.AtomicInteger
 
 /**
@@ -49,13 +50,25 @@ class McpClient {
         explicitNulls = false
     }
     
+    // Handshake payloads never change, so encode them once per client
+    private val initializeParams = json.encodeToJsonElement(InitializeRequest()).jsonObject
+    private val initializedNotificationBody = json.encodeToString(buildJsonObject {
+        put("jsonrpc", "2.0")
+        put("method", "notifications/initialized")
+    })
+    
+    // Verbose per-message tracing, off by default; enable with -Dmcp.inspector.debug=true
+    private val debugLogging = System.getProperty("mcp.inspector.debug") == "true"
+    
     private val requestIdCounter = AtomicInteger(0)
-    private val pendingRequests = mutableMapOf<String, CompletableDeferred<McpResponse>>()
+    // Request id -> waiting caller; completed from the SSE reader on Dispatchers.IO
+    private val pendingRequests = ConcurrentHashMap<String, CompletableDeferred<McpResponse>>()
     
     private var sseJob: Job? = null
     private var currentServerUrl: String = ""
     private var sessionId: String? = null
     private var messagesEndpoint: String? = null
+    private var messagesUrl: String? = null
     private var reconnectAttempts = 0
     private val maxReconnectAttempts = 5
     private var isReconnecting = false
@@ -198,71 +211,39 @@ class McpClient {
                                 println("McpClient: Starting to read SSE stream...")
                                 reconnectAttempts = 0 // Reset on successful connection
                                 
+                                // Data lines of the event being read; joined once the event is complete
+                                val dataLines = mutableListOf<String>()
+                                
                                 while (!channel.isClosedForRead && isActive) {
                                     try {
                                         val chunk = channel.readUTF8Line(limit = 8192)
                                         if (chunk != null) {
-                                            println("McpClient: Received SSE chunk: '$chunk'")
+                                            debugLog { "Received SSE chunk: '$chunk'" }
                                             when {
                                                 chunk.startsWith("event: endpoint") -> {
-                                                    println("McpClient: Received endpoint event")
+                                                    debugLog { "Received endpoint event" }
                                                     continue
                                                 }
                                                 chunk.startsWith("event: message") -> {
-                                                    println("McpClient: Received message event")
+                                                    debugLog { "Received message event" }
                                                     continue
                                                 }
-                                                chunk.startsWith("data: ") -> {
-                                                    val data = chunk.substring(6).trim()
-                                                    println("McpClient: Processing data: '$data'")
-                                                    
-                                                    when {
-                                                        data.startsWith("/messages/") || data.startsWith("/messages?") -> {
-                                                            // Extract session info from endpoint
-                                                            println("McpClient: Found messages endpoint: $data")
-                                                            messagesEndpoint = data
-                                                            
-                                                            // Extract session ID from the endpoint
-                                                            val sessionIdMatch = Regex("session_id=([^&]+)").find(data)
-                                                            if (sessionIdMatch != null) {
-                                                                sessionId = sessionIdMatch.groupValues[1]
-                                                                println("McpClient: Extracted session ID: $sessionId")
-                                                            } else {
-                                                                println("McpClient: No session ID found in endpoint")
-                                                            }
-                                                            
-                                                            // Signal that we have session info
-                                                            if (!deferred.isCompleted) {
-                                                                println("McpClient: Session info obtained, completing connection setup")
-                                                                deferred.complete(Unit)
-                                                            }
-                                                        }
-                                                        data.startsWith("{") -> {
-                                                            // JSON response
-                                                            try {
-                                                                println("McpClient: Processing JSON message: $data")
-                                                                processMessage(data)
-                                                            } catch (e: Exception) {
-                                                                println("McpClient: Failed to process JSON message: $data, error: ${e.message}")
-                                                            }
-                                                        }
-                                                        data.isBlank() || data.startsWith(":") || data == "[DONE]" -> {
-                                                            // Ignore empty data, comments, or done markers
-                                                            continue
-                                                        }
-                                                        else -> {
-                                                            println("McpClient: Unhandled data format: $data")
-                                                        }
-                                                    }
+                                                chunk.startsWith("data:") -> {
+                                                    // A single space after the colon is not part of the value
+                                                    dataLines.add(chunk.substring(5).removePrefix(" "))
                                                 }
                                                 chunk.startsWith(":") -> {
                                                     // Comment line (including ping)
-                                                    println("McpClient: Received ping: $chunk")
+                                                    debugLog { "Received ping: $chunk" }
                                                     continue
                                                 }
                                                 chunk.isEmpty() -> {
                                                     // Empty line indicates end of message
-                                                    continue
+                                                    if (dataLines.isNotEmpty()) {
+                                                        val data = dataLines.joinToString("\n").trim()
+                                                        dataLines.clear()
+                                                        handleSseData(data, deferred)
+                                                    }
                                                 }
                                                 else -> {
                                                     println("McpClient: Unhandled SSE chunk: '$chunk'")
@@ -338,6 +319,49 @@ class McpClient {
         }
     }
     
+    /**
+     * Handle the data payload of a complete SSE event
+     */
+    private fun handleSseData(data: String, sessionReady: CompletableDeferred<Unit>) {
+        debugLog { "Processing data: '$data'" }
+        
+        when {
+            data.startsWith("/messages/") || data.startsWith("/messages?") -> {
+                // Extract session info from endpoint
+                println("McpClient: Found messages endpoint: $data")
+                messagesEndpoint = data
+                // Resolve the POST target once per session instead of per request
+                messagesUrl = currentServerUrl.replace("/sse", "") + data
+                
+                // Extract session ID from the endpoint
+                val sessionIdMatch = Regex("session_id=([^&]+)").find(data)
+                if (sessionIdMatch != null) {
+                    sessionId = sessionIdMatch.groupValues[1]
+                    println("McpClient: Extracted session ID: $sessionId")
+                } else {
+                    println("McpClient: No session ID found in endpoint")
+                }
+                
+                // Signal that we have session info
+                if (!sessionReady.isCompleted) {
+                    println("McpClient: Session info obtained, completing connection setup")
+                    sessionReady.complete(Unit)
+                }
+            }
+            data.isBlank() || data.startsWith(":") || data == "[DONE]" -> {
+                // Ignore empty data, comments, or done markers
+            }
+            data.startsWith("{") || data.startsWith("[") -> {
+                // JSON response (single or batched); processMessage reports its own failures
+                debugLog { "Processing JSON message: $data" }
+                processMessage(data)
+            }
+            else -> {
+                println("McpClient: Unhandled data format: $data")
+            }
+        }
+    }
+    
     /**
      * Disconnect from MCP server
      */
@@ -346,6 +370,7 @@ class McpClient {
         pendingRequests.clear()
         sessionId = null
         messagesEndpoint = null
+        messagesUrl = null
         reconnectAttempts = 0
         isReconnecting = false
         
@@ -387,12 +412,11 @@ class McpClient {
     private suspend fun initialize(): Result<ServerInfo> {
         return try {
             println("McpClient: Initializing MCP session...")
-            val initRequest = InitializeRequest()
             val request = McpRequest(
                 jsonrpc = "2.0",
                 id = generateRequestId(),
                 method = "initialize",
-                params = json.encodeToJsonElement(initRequest).jsonObject
+                params = initializeParams
             )
             
             println("McpClient: Sending initialize request with ID: ${request.id}")
@@ -428,21 +452,13 @@ class McpClient {
      */
     private suspend fun sendInitializedNotification() {
         try {
-            val notification = buildJsonObject {
-                put("jsonrpc", "2.0")
-                put("method", "notifications/initialized")
-            }
-            
-            val endpoint = messagesEndpoint
-            if (endpoint != null) {
-                val baseUrl = currentServerUrl.replace("/sse", "")
-                val fullUrl = "$baseUrl$endpoint"
-                
+            val fullUrl = messagesUrl
+            if (fullUrl != null) {
                 println("McpClient: Sending initialized notification to $fullUrl")
                 
                 val response = httpClient.post(fullUrl) {
                     contentType(ContentType.Application.Json)
-                    setBody(json.encodeToString(notification))
+                    setBody(initializedNotificationBody)
                 }
                 
                 println("McpClient: Initialized notification response: ${response.status}")
@@ -560,7 +576,7 @@ class McpClient {
      * Call a tool with parameters
      */
     suspend fun callTool(toolName: String, parameters: Map<String, Any>): Result<CallToolResult> {
-        val startTime = System.currentTimeMillis()
+        val startTime = System.nanoTime()
         val historyId = generateRequestId()
         
         return try {
@@ -591,7 +607,7 @@ class McpClient {
             )
             
             val response = sendRequest(request)
-            val executionTime = System.currentTimeMillis() - startTime
+            val executionTime = elapsedMillis(startTime)
             
             if (response.error != null) {
                 val error = "Tool execution failed: ${response.error.message}"
@@ -653,7 +669,7 @@ class McpClient {
                 Result.success(result)
             }
         } catch (e: Exception) {
-            val executionTime = System.currentTimeMillis() - startTime
+            val executionTime = elapsedMillis(startTime)
             val error = "Tool execution failed: ${e.message}"
             _executionState.value = _executionState.value.copy(
                 isExecuting = false,
@@ -693,8 +709,8 @@ class McpClient {
         pendingRequests[request.id] = deferred
         
         return try {
-            val endpoint = messagesEndpoint
-            if (endpoint == null) {
+            val fullUrl = messagesUrl
+            if (fullUrl == null) {
                 println("McpClient: No messages endpoint available for request ${request.id}")
                 throw Exception("No messages endpoint available")
             }
@@ -706,21 +722,21 @@ class McpClient {
             }
             
             // Send request via HTTP POST to the messages endpoint
-            val baseUrl = currentServerUrl.replace("/sse", "")
-            val fullUrl = "$baseUrl$endpoint"
+            // Encode once and reuse the same body for logging and the wire
+            val requestBody = json.encodeToString(request)
             
-            println("McpClient: Sending ${request.method} request to $fullUrl")
-            println("McpClient: Request body: ${json.encodeToString(request)}")
-            println("McpClient: Pending requests before send: ${pendingRequests.keys}")
+            debugLog { "Sending ${request.method} request to $fullUrl" }
+            debugLog { "Request body: $requestBody" }
+            debugLog { "Pending requests before send: ${pendingRequests.keys}" }
             
-            val startTime = System.currentTimeMillis()
+            val startTime = System.nanoTime()
             val response = httpClient.post(fullUrl) {
                 contentType(ContentType.Application.Json)
-                setBody(json.encodeToString(request))
+                setBody(requestBody)
             }
             
-            val httpTime = System.currentTimeMillis() - startTime
-            println("McpClient: HTTP POST response status: ${response.status} (took ${httpTime}ms)")
+            val httpTime = elapsedMillis(startTime)
+            debugLog { "HTTP POST response status: ${response.status} (took ${httpTime}ms)" }
             
             // Accept both 200 OK and 202 Accepted as successful responses
             if (response.status != HttpStatusCode.OK && response.status != HttpStatusCode.Accepted) {
@@ -735,16 +751,16 @@ class McpClient {
                     )
                 )
             } else {
-                println("McpClient: HTTP POST successful (${response.status}), waiting for SSE response...")
-                println("McpClient: Pending requests after HTTP POST: ${pendingRequests.keys}")
+                debugLog { "HTTP POST successful (${response.status}), waiting for SSE response..." }
+                debugLog { "Pending requests after HTTP POST: ${pendingRequests.keys}" }
                 
                 // Wait for response via SSE with shorter timeout and better error handling
                 try {
                     withTimeout(15000) { // Reduced timeout to 15 seconds
-                        val sseStartTime = System.currentTimeMillis()
+                        val sseStartTime = System.nanoTime()
                         val result = deferred.await()
-                        val sseTime = System.currentTimeMillis() - sseStartTime
-                        println("McpClient: SSE response received for ${request.id} (took ${sseTime}ms)")
+                        val sseTime = elapsedMillis(sseStartTime)
+                        debugLog { "SSE response received for ${request.id} (took ${sseTime}ms)" }
                         result
                     }
                 } catch (e: kotlinx.coroutines.TimeoutCancellationException) {
@@ -789,19 +805,26 @@ class McpClient {
     
     /**
      * Process incoming SSE messages
+     * A message is either a single JSON-RPC response or a batch (JSON array) of them
      */
     private fun processMessage(message: String) {
         try {
-            println("Processing SSE message: $message")
-            val response = json.decodeFromString<McpResponse>(message)
-            println("Parsed response: id=${response.id}, error=${response.error}, result=${response.result}")
-            response.id?.let { id ->
-                val deferred = pendingRequests.remove(id)
-                if (deferred != null) {
-                    println("Completing request $id")
-                    deferred.complete(response)
-                } else {
-                    println("No pending request found for id: $id")
+            debugLog { "Processing SSE message: $message" }
+            val responses = if (message.startsWith("[")) {
+                json.decodeFromString<List<McpResponse>>(message)
+            } else {
+                listOf(json.decodeFromString<McpResponse>(message))
+            }
+            responses.forEach { response ->
+                debugLog { "Parsed response: id=${response.id}, error=${response.error}, result=${response.result}" }
+                response.id?.let { id ->
+                    val deferred = pendingRequests.remove(id)
+                    if (deferred != null) {
+                        debugLog { "Completing request $id" }
+                        deferred.complete(response)
+                    } else {
+                        println("No pending request found for id: $id")
+                    }
                 }
             }
         } catch (e: Exception) {
@@ -809,11 +832,31 @@ class McpClient {
         }
     }
     
+    /**
+     * Print a trace message only when debug logging is enabled.
+     * The message is not built otherwise, keeping the SSE read loop cheap.
+     */
+    private inline fun debugLog(message: () -> String) {
+        if (debugLogging) {
+            println("McpClient: ${message()}")
+        }
+    }
+    
+    /**
+     * Milliseconds since a System.nanoTime() reading; unaffected by wall-clock changes
+     */
+    private fun elapsedMillis(startNanos: Long): Long {
+        return (System.nanoTime() - startNanos) / 1_000_000
+    }
+    
     /**
      * Generate unique request ID
+     * The counter guarantees uniqueness; the random suffix only tells sessions apart,
+     * so it does not need UUID's SecureRandom. Setting the top bit keeps it 8 hex digits.
      */
     private fun generateRequestId(): String {
-        return "req_${requestIdCounter.incrementAndGet()}_${UUID.randomUUID().toString().take(8)}"
+        val suffix = Integer.toHexString(ThreadLocalRandom.current().nextInt() or Int.MIN_VALUE)
+        return "req_${requestIdCounter.incrementAndGet()}_$suffix"
     }
     
     /**